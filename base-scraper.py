@@ -1,17 +1,34 @@
 # Base Scraper Module
 # src/scrapers/modules/base_scraper.py
+#
+# Runtime: the scraper and processor entry points should run on uvloop, e.g.
+# `import uvloop; uvloop.install()` in main.py before starting the event loop.
+# Nothing in this module depends on it.
 
 import asyncio
 import aiohttp
+import diskcache
 import time
 import logging
+import re
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass
+from typing import List, Dict, Optional, Any, ClassVar, AsyncIterator, Tuple, Mapping
+from dataclasses import dataclass, asdict
+from functools import lru_cache
 from urllib.parse import urljoin, urlparse
 from datetime import datetime, timezone
 
-@dataclass
+# Match when the text is at least 10 / 100 characters long once stripped, i.e.
+# len(text.strip()) >= n, without copying or scanning the whole body
+_HAS_TEN = re.compile(r"\s*\S.{8,}?\S", re.DOTALL)
+_HAS_HUNDRED = re.compile(r"\s*\S.{98,}?\S", re.DOTALL)
+
+@lru_cache(maxsize=4096)
+def _parsed(url: str):
+    """Memoized urlparse; discovery and validation parse the same URLs repeatedly"""
+    return urlparse(url)
+
+@dataclass(slots=True)
 class ContentItem:
     """Data model for scraped content items"""
     title: str
@@ -33,6 +50,10 @@ class ContentItem:
 class BaseScraper(ABC):
     """Base class for all content scrapers"""
     
+    # One pooled session for the lifetime of the app, shared by all scrapers
+    shared_session: ClassVar[Optional[aiohttp.ClientSession]] = None
+    shared_session_loop: ClassVar[Optional[asyncio.AbstractEventLoop]] = None
+    
     def __init__(self, source_config: Dict[str, Any]):
         self.source_config = source_config
         self.source_name = source_config.get("name", "Unknown")
@@ -40,56 +61,186 @@ class BaseScraper(ABC):
         self.rate_limit = source_config.get("rate_limit", 1.0)  # seconds between requests
         self.max_concurrent = source_config.get("max_concurrent", 5)
         self.timeout = source_config.get("timeout", 30)
+        self.max_body_bytes = source_config.get("max_body_bytes", 10_000_000)  # larger bodies fail the fetch
         self.headers = source_config.get("headers", {
             "User-Agent": "Mozilla/5.0 (compatible; NicheSyndicationBot/1.0)"
         })
         
         self.logger = logging.getLogger(f"scraper.{self.source_name}")
         self.session: Optional[aiohttp.ClientSession] = None
-        self.last_request_time = 0
+        self.client_timeout = aiohttp.ClientTimeout(total=self.timeout)
+        
+        # Optional on-disk cache of scraped items and failed fetches, keyed by URL
+        cache_dir = source_config.get("cache_dir")
+        self.cache: Optional[diskcache.Cache] = diskcache.Cache(cache_dir) if cache_dir else None
+        self.cache_ttl = source_config.get("cache_ttl", 86400)  # seconds
+        self.negative_cache_ttl = source_config.get("negative_cache_ttl", 3600)  # seconds
+        self.force_rescrape = source_config.get("force_rescrape", False)
+        
+        # Token bucket: bursts up to max_concurrent, refills one token per rate_limit seconds
+        self._tokens: float = float(self.max_concurrent)
+        self._last_refill: float = time.monotonic()
+        self._tb_lock = asyncio.Lock()
+        
+        # Bounds in-flight HTTP requests only; parsing runs outside it
+        self._fetch_sem = asyncio.Semaphore(self.max_concurrent)
+        
+    @classmethod
+    async def get_session(
+        cls,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        ttl_dns_cache: int = 300,
+        keepalive_timeout: float = 30
+    ) -> aiohttp.ClientSession:
+        """Return the shared ClientSession, creating it on first use
+        
+        Connector settings only apply when the session is created, so the first
+        scraper to enter decides them for the lifetime of the app. A session is
+        bound to its event loop, so a new one is created when the loop changes
+        (e.g. repeated asyncio.run() calls in a warm process).
+        """
+        session = BaseScraper.shared_session
+        loop = asyncio.get_running_loop()
+        if session is None or session.closed or BaseScraper.shared_session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=limit,
+                limit_per_host=limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=ttl_dns_cache,
+                keepalive_timeout=keepalive_timeout
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            BaseScraper.shared_session = session
+            BaseScraper.shared_session_loop = loop
+        return session
+        
+    @classmethod
+    async def close_shared(cls):
+        """Close the shared ClientSession; call once on app shutdown"""
+        session = BaseScraper.shared_session
+        BaseScraper.shared_session = None
+        BaseScraper.shared_session_loop = None
+        if session and not session.closed:
+            await session.close()
         
     async def __aenter__(self):
         """Async context manager entry"""
-        connector = aiohttp.TCPConnector(limit=self.max_concurrent)
-        timeout = aiohttp.ClientTimeout(total=self.timeout)
-        self.session = aiohttp.ClientSession(
-            connector=connector,
-            timeout=timeout,
-            headers=self.headers
+        self.session = await self.get_session(
+            limit=self.source_config.get("connector_limit", max(100, self.max_concurrent * 4)),
+            limit_per_host=self.source_config.get("limit_per_host", self.max_concurrent),
+            ttl_dns_cache=self.source_config.get("ttl_dns_cache", 300),  # seconds
+            keepalive_timeout=self.source_config.get("keepalive_timeout", 30)  # seconds
         )
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        # The shared session outlives the scraper, see close_shared()
+        self.session = None
+            
+    def _refill_tokens(self):
+        """Add tokens accrued since the last refill, capped at max_concurrent"""
+        now = time.monotonic()
+        refill = (now - self._last_refill) / self.rate_limit
+        self._tokens = min(float(self.max_concurrent), self._tokens + refill)
+        self._last_refill = now
+        
+    def take_nowait(self) -> bool:
+        """Take a request token without waiting; returns False if none is available"""
+        if self.rate_limit <= 0:
+            return True
             
+        self._refill_tokens()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+        
     async def rate_limit_delay(self):
         """Enforce rate limiting between requests"""
-        time_since_last = time.time() - self.last_request_time
-        if time_since_last < self.rate_limit:
-            await asyncio.sleep(self.rate_limit - time_since_last)
-        self.last_request_time = time.time()
+        if self.rate_limit <= 0:
+            return
+            
+        # The lock only guards the bucket: reserve a token (possibly going into
+        # debt) and compute the wait, then sleep with the lock released
+        async with self._tb_lock:
+            self._refill_tokens()
+            self._tokens -= 1
+            wait = -self._tokens * self.rate_limit if self._tokens < 0 else 0
+            
+        if wait:
+            await asyncio.sleep(wait)
         
-    async def fetch_url(self, url: str, **kwargs) -> Optional[str]:
+    async def fetch_url(self, url: str, force: bool = False, **kwargs) -> Optional[str]:
         """Fetch content from a URL with error handling and rate limiting"""
+        _, body, _ = await self.fetch_response(url, force=force, **kwargs)
+        return body
+        
+    async def fetch_response(
+        self, url: str, force: bool = False, **kwargs
+    ) -> Tuple[Optional[int], Optional[str], Mapping[str, str]]:
+        """Fetch a URL and return (status, body, response headers)
+        
+        The body is only set for HTTP 200; status is None if no response was received.
+        """
+        if self.cache is not None and not force and ("status", url) in self.cache:
+            self.logger.debug(f"Skipping {url}, recently failed")
+            return None, None, {}
+            
         await self.rate_limit_delay()
         
+        # The session is shared across sources, so per-source settings go on the request
+        kwargs.setdefault("headers", self.headers)
+        kwargs.setdefault("timeout", self.client_timeout)
+        
         try:
-            async with self.session.get(url, **kwargs) as response:
+            async with self._fetch_sem, self.session.get(url, **kwargs) as response:
+                headers = response.headers.copy()  # case-insensitive
                 if response.status == 200:
-                    return await response.text()
+                    body = await self._read_body(url, response)
+                    if body is None:
+                        # Oversized: fail the fetch so nothing partial is parsed or cached
+                        return None, None, {}
+                    return response.status, body, headers
+                elif response.status == 304:
+                    self.logger.debug(f"Not modified: {url}")
+                    return response.status, None, headers
                 else:
                     self.logger.warning(f"HTTP {response.status} for {url}")
-                    return None
+                    if self.cache is not None and response.status in (404, 410):
+                        self.cache.set(("status", url), response.status, expire=self.negative_cache_ttl)
+                    return response.status, None, headers
                     
         except asyncio.TimeoutError:
             self.logger.error(f"Timeout fetching {url}")
-            return None
+            return None, None, {}
         except Exception as e:
             self.logger.error(f"Error fetching {url}: {e}")
+            return None, None, {}
+            
+    async def _read_body(self, url: str, response: aiohttp.ClientResponse) -> Optional[str]:
+        """Read a response body in chunks, returning None if it exceeds max_body_bytes"""
+        if response.content_length is not None and response.content_length > self.max_body_bytes:
+            self.logger.warning(f"Response for {url} exceeds {self.max_body_bytes} bytes, skipping")
             return None
             
+        buf = bytearray()
+        async for chunk in response.content.iter_chunked(65536):
+            buf += chunk
+            if len(buf) > self.max_body_bytes:
+                self.logger.warning(f"Response for {url} exceeds {self.max_body_bytes} bytes, skipping")
+                return None
+                
+        # get_encoding() needs the whole body buffered, so use the declared charset;
+        # feeds and pages often omit it, and UTF-8 is the safe default then
+        encoding = response.charset or "utf-8"
+        try:
+            return buf.decode(encoding, errors="replace")
+        except LookupError:
+            self.logger.debug(f"Unknown charset {encoding!r} for {url}, decoding as UTF-8")
+            return buf.decode("utf-8", errors="replace")
+        
     @abstractmethod
     async def discover_urls(self) -> List[str]:
         """Discover URLs to scrape from the source"""
@@ -100,11 +251,18 @@ class BaseScraper(ABC):
         """Parse content from HTML and return ContentItem"""
         pass
         
-    async def scrape_single_url(self, url: str) -> Optional[ContentItem]:
+    async def scrape_single_url(self, url: str, force: bool = False) -> Optional[ContentItem]:
         """Scrape a single URL and return ContentItem"""
+        force = force or self.force_rescrape
+        if self.cache is not None and not force:
+            cached = self.cache.get(url)
+            if cached:
+                self.logger.debug(f"Cache hit for {url}")
+                return ContentItem(**cached)
+                
         self.logger.info(f"Scraping {url}")
         
-        html = await self.fetch_url(url)
+        html = await self.fetch_url(url, force=force)
         if not html:
             return None
             
@@ -112,6 +270,8 @@ class BaseScraper(ABC):
             content_item = await self.parse_content(url, html)
             if content_item:
                 content_item.source_name = self.source_name
+                if self.cache is not None:
+                    self.cache.set(url, asdict(content_item), expire=self.cache_ttl)
                 self.logger.info(f"Successfully scraped: {content_item.title}")
                 return content_item
             else:
@@ -122,52 +282,57 @@ class BaseScraper(ABC):
             self.logger.error(f"Error parsing {url}: {e}")
             return None
             
-    async def scrape_all(self, max_items: int = 20) -> List[ContentItem]:
-        """Scrape all available content up to max_items"""
+    async def scrape_all_iter(self, max_items: int = 20) -> AsyncIterator[ContentItem]:
+        """Scrape available content up to max_items, yielding items as they complete"""
         self.logger.info(f"Starting scrape for {self.source_name}")
         
         try:
             urls = await self.discover_urls()
-            if not urls:
-                self.logger.warning("No URLs discovered")
-                return []
-                
-            # Limit URLs to max_items
-            urls = urls[:max_items]
-            self.logger.info(f"Discovered {len(urls)} URLs to scrape")
+        except Exception as e:
+            self.logger.error(f"Error in scrape_all: {e}")
+            return
             
-            # Create semaphore to limit concurrent requests
-            semaphore = asyncio.Semaphore(self.max_concurrent)
+        if not urls:
+            self.logger.warning("No URLs discovered")
+            return
             
-            async def scrape_with_semaphore(url):
-                async with semaphore:
-                    return await self.scrape_single_url(url)
+        # Limit URLs to max_items
+        urls = urls[:max_items]
+        self.logger.info(f"Discovered {len(urls)} URLs to scrape")
+        
+        # Execute scraping tasks, handing each item on as soon as it is ready.
+        # Concurrency is bounded in fetch_url so parsing overlaps with fetching.
+        tasks = [asyncio.ensure_future(self.scrape_single_url(url)) for url in urls]
+        scraped = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    result = await next_done
+                except Exception as e:
+                    self.logger.error(f"Task failed with exception: {e}")
+                    continue
                     
-            # Execute scraping tasks
-            tasks = [scrape_with_semaphore(url) for url in urls]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Filter out None results and exceptions
-            content_items = []
-            for result in results:
                 if isinstance(result, ContentItem):
-                    content_items.append(result)
-                elif isinstance(result, Exception):
-                    self.logger.error(f"Task failed with exception: {result}")
+                    scraped += 1
+                    yield result
+        finally:
+            # The consumer may stop early; don't leave scrapes running
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
                     
-            self.logger.info(f"Successfully scraped {len(content_items)} items")
-            return content_items
-            
-        except Exception as e:
-            self.logger.error(f"Error in scrape_all: {e}")
-            return []
+        self.logger.info(f"Successfully scraped {scraped} items")
+        
+    async def scrape_all(self, max_items: int = 20) -> List[ContentItem]:
+        """Scrape all available content up to max_items"""
+        return [item async for item in self.scrape_all_iter(max_items)]
             
     def validate_content_item(self, item: ContentItem) -> bool:
         """Validate that a content item meets minimum requirements"""
-        if not item.title or len(item.title.strip()) < 10:
+        if not item.title or not _HAS_TEN.match(item.title):
             return False
             
-        if not item.content or len(item.content.strip()) < 100:
+        if not item.content or not _HAS_HUNDRED.match(item.content):
             return False
             
         if not item.url or not self.is_valid_url(item.url):
@@ -179,14 +344,14 @@ class BaseScraper(ABC):
     def is_valid_url(url: str) -> bool:
         """Check if URL is valid"""
         try:
-            result = urlparse(url)
-            return all([result.scheme, result.netloc])
+            result = _parsed(url)
+            return bool(result.scheme and result.netloc)
         except Exception:
             return False
             
     def extract_domain(self, url: str) -> str:
         """Extract domain from URL"""
         try:
-            return urlparse(url).netloc
+            return _parsed(url).netloc
         except Exception:
             return ""
\ No newline at end of file
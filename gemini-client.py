@@ -4,12 +4,185 @@
 import os
 import logging
 import asyncio
+import hashlib
 import json
+import random
+import orjson
+import diskcache
 from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime
+from datetime import datetime, timezone
 import google.generativeai as genai
+from google.api_core import exceptions as gexc
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
+def _iso_now() -> str:
+    """Current UTC time as an ISO 8601 string"""
+    return datetime.now(timezone.utc).isoformat()
+
+# Decodes exactly one JSON value from an offset, ignoring whatever follows it
+_DECODER = json.JSONDecoder()
+
+# Prompt templates; only the per-item fields are filled in at call time
+_ANALYSIS_PROMPT = """\
+You are an expert content analyst for a niche industry news syndication service.
+Analyze the following content from {source} and extract key information.
+
+TITLE: {title}
+
+CONTENT:
+{text}
+
+Provide a detailed analysis in JSON format with the following structure:
+{{
+    "summary": "Brief 2-3 sentence summary of the content",
+    "key_points": ["List of 3-5 key points from the article"],
+    "entities": ["Important people, companies, products, etc. mentioned"],
+    "industry_relevance": "Assessment of how relevant this is to the industry (High/Medium/Low)",
+    "sentiment": "Overall sentiment of the article (Positive/Negative/Neutral)",
+    "categories": ["List of relevant categories/tags"],
+    "action_items": ["Potential action items for industry professionals"]
+}}
+
+Return ONLY the JSON without any additional text or explanation.
+"""
+
+_ENHANCEMENT_PROMPT = """\
+You are an expert content editor for a niche industry news syndication service.
+Enhance the following content based on the provided analysis.
+
+ORIGINAL TITLE: {title}
+
+ORIGINAL CONTENT:
+{text}
+
+ANALYSIS SUMMARY: {summary}
+
+KEY POINTS:
+{key_points_text}
+
+Enhance this content by:
+1. Creating an improved, attention-grabbing title
+2. Writing a concise, engaging introduction (1-2 paragraphs)
+3. Restructuring and enhancing the main content while preserving all factual information
+4. Adding a conclusion with industry implications
+5. Adding section headings where appropriate
+
+Provide the enhanced content in JSON format with this structure:
+{{
+    "enhanced_title": "Improved title",
+    "introduction": "Engaging introduction paragraphs",
+    "enhanced_content": "Full enhanced content with HTML formatting",
+    "conclusion": "Added conclusion with industry implications",
+    "suggested_hashtags": ["5-7 relevant hashtags"]
+}}
+
+Return ONLY the JSON without any additional text or explanation.
+"""
+
+_SOCIAL_PROMPT = """\
+You are a social media expert for a niche industry news syndication service.
+Create platform-specific posts for the following content.
+
+TITLE: {title}
+
+INTRODUCTION:
+{intro}
+
+URL: {url}
+
+Create engaging social media posts for these platforms: {platforms_text}
+
+For each platform, follow these guidelines:
+- LinkedIn: Professional tone, 1-2 paragraphs, 3-5 hashtags, include URL
+- Twitter: Concise, engaging, under 280 characters, 1-2 hashtags, include URL
+- Telegram: Informative summary with key points, include URL
+
+Provide the posts in JSON format with this structure:
+{{
+    "linkedin": "LinkedIn post content",
+    "twitter": "Twitter post content",
+    "telegram": "Telegram post content"
+}}
+
+Only include the platforms requested. Return ONLY the JSON without any additional text.
+"""
+
+_BATCH_ANALYSIS_PROMPT = """\
+You are an expert content analyst for a niche industry news syndication service.
+Analyze each of the following {count} content items and extract key information.
+
+ITEMS (JSON list with id, source, title and content):
+{items}
+
+Provide a detailed analysis of every item as a JSON list with one object per item, in the same order,
+each with the following structure:
+{{
+    "id": "The id of the item being analyzed, copied exactly",
+    "summary": "Brief 2-3 sentence summary of the content",
+    "key_points": ["List of 3-5 key points from the article"],
+    "entities": ["Important people, companies, products, etc. mentioned"],
+    "industry_relevance": "Assessment of how relevant this is to the industry (High/Medium/Low)",
+    "sentiment": "Overall sentiment of the article (Positive/Negative/Neutral)",
+    "categories": ["List of relevant categories/tags"],
+    "action_items": ["Potential action items for industry professionals"]
+}}
+
+Return ONLY the JSON list without any additional text or explanation.
+"""
+
+_PROCESS_PROMPT = """\
+You are an expert content analyst, editor and social media expert for a niche industry news syndication service.
+Process the following content from {source} in three steps: analyze it, enhance it based on your analysis,
+then write social media posts for the enhanced version.
+
+TITLE: {title}
+
+CONTENT:
+{text}
+
+URL: {url}
+
+ANALYSIS: Extract a brief 2-3 sentence summary, 3-5 key points, important entities, industry relevance
+(High/Medium/Low), overall sentiment (Positive/Negative/Neutral), relevant categories and potential action
+items for industry professionals.
+
+ENHANCEMENT: Using the analysis, create an improved, attention-grabbing title, a concise and engaging
+introduction (1-2 paragraphs), restructured main content with section headings that preserves all factual
+information, and a conclusion with industry implications.
+
+SOCIAL POSTS: Create engaging posts for these platforms: {platforms_text}
+- LinkedIn: Professional tone, 1-2 paragraphs, 3-5 hashtags, include URL
+- Twitter: Concise, engaging, under 280 characters, 1-2 hashtags, include URL
+- Telegram: Informative summary with key points, include URL
+
+Provide all results in a single JSON object with this structure:
+{{
+    "analysis": {{
+        "summary": "Brief 2-3 sentence summary of the content",
+        "key_points": ["List of 3-5 key points from the article"],
+        "entities": ["Important people, companies, products, etc. mentioned"],
+        "industry_relevance": "High/Medium/Low",
+        "sentiment": "Positive/Negative/Neutral",
+        "categories": ["List of relevant categories/tags"],
+        "action_items": ["Potential action items for industry professionals"]
+    }},
+    "enhancement": {{
+        "enhanced_title": "Improved title",
+        "introduction": "Engaging introduction paragraphs",
+        "enhanced_content": "Full enhanced content with HTML formatting",
+        "conclusion": "Added conclusion with industry implications",
+        "suggested_hashtags": ["5-7 relevant hashtags"]
+    }},
+    "social_posts": {{
+        "linkedin": "LinkedIn post content",
+        "twitter": "Twitter post content",
+        "telegram": "Telegram post content"
+    }}
+}}
+
+Only include the platforms requested. Return ONLY the JSON without any additional text or explanation.
+"""
+
 class GeminiProClient:
     """Client for interacting with Google's Gemini Pro API"""
     
@@ -29,6 +202,17 @@ class GeminiProClient:
         self.rate_limit_pause = config.get("rate_limit_pause", 2.0)  # seconds to pause on rate limit
         self.retry_attempts = config.get("retry_attempts", 3)
         self.retry_delay = config.get("retry_delay", 5.0)  # seconds between retries
+        self.max_concurrent_api = config.get("max_concurrent_api", 10)  # in-flight API calls
+        self.batch_size = config.get("batch_size", 10)  # items per batched analysis call
+        self.batch_max_chars = config.get("batch_max_chars", 100_000)  # content budget per batch
+        self._api_sem = asyncio.Semaphore(self.max_concurrent_api)
+        
+        # Optional on-disk cache of responses, keyed by model, generation config and prompt
+        self.cache_enabled = config.get("cache_enabled", False)
+        self.cache_ttl = config.get("cache_ttl", 7 * 86400)  # seconds
+        self._cache: Optional[diskcache.Cache] = (
+            diskcache.Cache(config.get("cache_dir", ".cache/gemini")) if self.cache_enabled else None
+        )
         
         # Configure safety settings
         self.safety_settings = {
@@ -42,17 +226,23 @@ class GeminiProClient:
         genai.configure(api_key=self.api_key)
         
         # Create the model
+        self.generation_config = {
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "top_k": self.top_k,
+            "max_output_tokens": self.max_tokens,
+        }
         self.model = genai.GenerativeModel(
             model_name=self.model_name,
-            generation_config={
-                "temperature": self.temperature,
-                "top_p": self.top_p,
-                "top_k": self.top_k,
-                "max_output_tokens": self.max_tokens,
-            },
+            generation_config=self.generation_config,
             safety_settings=self.safety_settings
         )
         
+        # Cache keys cover everything that shapes a response, not just the prompt
+        self._cache_key_prefix = orjson.dumps(
+            {"model": self.model_name, **self.generation_config}, option=orjson.OPT_SORT_KEYS
+        )
+        
     async def analyze_content(self, content: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze content and extract key information
@@ -76,9 +266,83 @@ class GeminiProClient:
             self.logger.error(f"Error analyzing content: {e}")
             return {
                 "error": str(e),
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _iso_now()
             }
             
+    async def analyze_batch(self, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze several content items with one API call per batch
+        
+        Items are packed into batches of up to batch_size items and batch_max_chars
+        characters of content, so the instructions and round trip are shared.
+        
+        Args:
+            items: List of content dictionaries; each is keyed by its "id", else its "url",
+                else its position, and keys must be unique (ValueError otherwise)
+            
+        Returns:
+            Dictionary mapping item id to its analysis results
+        """
+        keyed = []
+        for index, item in enumerate(items):
+            item_id = item.get("id")
+            if item_id is None:
+                item_id = item.get("url")
+            if item_id is None:
+                item_id = index
+            keyed.append((str(item_id), item))
+            
+        # Duplicate keys would silently overwrite each other's analyses
+        seen_ids, duplicates = set(), set()
+        for item_id, _ in keyed:
+            if item_id in seen_ids:
+                duplicates.add(item_id)
+            seen_ids.add(item_id)
+        if duplicates:
+            raise ValueError(f"Duplicate item ids in batch: {sorted(duplicates)}")
+            
+        batches: List[List[Tuple[str, Dict[str, Any]]]] = []
+        batch: List[Tuple[str, Dict[str, Any]]] = []
+        batch_chars = 0
+        for item_id, item in keyed:
+            item_chars = len(item.get("content", ""))
+            if batch and (len(batch) >= self.batch_size or batch_chars + item_chars > self.batch_max_chars):
+                batches.append(batch)
+                batch, batch_chars = [], 0
+            batch.append((item_id, item))
+            batch_chars += item_chars
+        if batch:
+            batches.append(batch)
+            
+        results: Dict[str, Dict[str, Any]] = {}
+        for batch_results in await asyncio.gather(*(self._analyze_one_batch(b) for b in batches)):
+            results.update(batch_results)
+        return results
+        
+    async def _analyze_one_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """Analyze a single batch of (id, content) pairs"""
+        prompt = self._create_batch_analysis_prompt(batch)
+        
+        try:
+            result = await self._generate_with_retry(prompt, opener="[")
+            parsed = self._extract_json(result, opener="[")
+            
+            analyses = {}
+            for analysis in parsed:
+                if isinstance(analysis, dict) and "id" in analysis:
+                    analyses[str(analysis.pop("id"))] = analysis
+                    
+            self.logger.info(f"Successfully analyzed batch of {len(batch)} items")
+            return {
+                item_id: analyses.get(item_id) or {"error": "Analysis missing from batch result"}
+                for item_id, _ in batch
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error analyzing batch: {e}")
+            timestamp = _iso_now()
+            return {item_id: {"error": str(e), "timestamp": timestamp} for item_id, _ in batch}
+            
     async def enhance_content(self, content: Dict[str, Any], analysis: Dict[str, Any]) -> Dict[str, Any]:
         """
         Enhance content based on analysis results
@@ -101,7 +365,7 @@ class GeminiProClient:
             enhanced["original_content"] = content.get("content", "")
             enhanced["original_url"] = content.get("url", "")
             enhanced["source_name"] = content.get("source_name", "")
-            enhanced["enhanced_at"] = datetime.utcnow().isoformat()
+            enhanced["enhanced_at"] = _iso_now()
             
             self.logger.info(f"Successfully enhanced content: {content.get('title', 'Untitled')}")
             return enhanced
@@ -110,7 +374,7 @@ class GeminiProClient:
             self.logger.error(f"Error enhancing content: {e}")
             return {
                 "error": str(e),
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _iso_now()
             }
             
     async def generate_social_posts(self, content: Dict[str, Any], platforms: List[str]) -> Dict[str, Any]:
@@ -137,84 +401,143 @@ class GeminiProClient:
             self.logger.error(f"Error generating social posts: {e}")
             return {
                 "error": str(e),
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _iso_now()
             }
             
-    async def _generate_with_retry(self, prompt: str) -> str:
+    async def process_item(self, content: Dict[str, Any], platforms: List[str]) -> Dict[str, Any]:
         """
-        Generate content with retry logic for handling rate limits and errors
+        Analyze, enhance and generate social posts for content in a single API call
+        
+        Sends the article once instead of three round trips through analyze_content,
+        enhance_content and generate_social_posts.
         
         Args:
-            prompt: The prompt to send to Gemini
+            content: Dictionary containing content data (title, text, etc.)
+            platforms: List of platforms to generate posts for (e.g., ["linkedin", "twitter"])
             
         Returns:
-            The generated text result
+            Dictionary with "analysis", "enhancement" and "social_posts" results
         """
-        for attempt in range(self.retry_attempts):
-            try:
-                # Call the Gemini API (needs to be async compatible)
-                return await asyncio.to_thread(
-                    self._call_gemini_api,
-                    prompt
-                )
-                
-            except Exception as e:
-                if "rate limit" in str(e).lower() and attempt < self.retry_attempts - 1:
-                    # Rate limit hit, pause and retry
-                    self.logger.warning(f"Rate limit hit, pausing for {self.rate_limit_pause} seconds")
-                    await asyncio.sleep(self.rate_limit_pause)
-                    continue
-                    
-                if attempt < self.retry_attempts - 1:
-                    # Other error, retry after delay
-                    self.logger.warning(f"API error: {e}, retrying in {self.retry_delay} seconds")
-                    await asyncio.sleep(self.retry_delay)
-                    continue
-                    
-                # All retries failed, raise the exception
-                raise
-                
-    def _call_gemini_api(self, prompt: str) -> str:
+        prompt = self._create_process_prompt(content, platforms)
+        
+        try:
+            result = await self._generate_with_retry(prompt)
+            parsed = self._extract_json(result)
+            
+            analysis = parsed.get("analysis") or {"error": "Missing analysis in result"}
+            enhanced = parsed.get("enhancement") or {"error": "Missing enhancement in result"}
+            social = parsed.get("social_posts") or {}
+            
+            # Combine with original content, as enhance_content does
+            enhanced["original_title"] = content.get("title", "")
+            enhanced["original_content"] = content.get("content", "")
+            enhanced["original_url"] = content.get("url", "")
+            enhanced["source_name"] = content.get("source_name", "")
+            enhanced["enhanced_at"] = _iso_now()
+            
+            self.logger.info(f"Successfully processed content: {content.get('title', 'Untitled')}")
+            return {
+                "analysis": analysis,
+                "enhancement": enhanced,
+                "social_posts": {platform: social[platform] for platform in platforms if platform in social}
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error processing content: {e}")
+            return {
+                "error": str(e),
+                "timestamp": _iso_now()
+            }
+            
+    async def _generate_with_retry(self, prompt: str, opener: str = "{") -> str:
         """
-        Make a synchronous call to the Gemini API
+        Generate content with retry logic, serving repeated prompts from the cache when enabled
         
         Args:
             prompt: The prompt to send to Gemini
+            opener: First character of the JSON value the response must contain to be cached
             
         Returns:
             The generated text result
         """
-        response = self.model.generate_content(prompt)
-        return response.text
+        if self._cache is not None:
+            key = hashlib.sha256(self._cache_key_prefix + prompt.encode()).hexdigest()
+            cached = self._cache.get(key)
+            if cached is not None:
+                self.logger.debug("Using cached Gemini response")
+                return cached
+                
+            result = await self._generate_uncached(prompt)
+            
+            # Truncated or malformed responses are returned but not replayed from the cache
+            try:
+                self._extract_json(result, opener)
+            except ValueError:
+                self.logger.debug("Not caching Gemini response without valid JSON")
+            else:
+                self._cache.set(key, result, expire=self.cache_ttl)
+            return result
+            
+        return await self._generate_uncached(prompt)
         
+    async def _generate_uncached(self, prompt: str) -> str:
+        """Call the Gemini API, retrying on rate limits and errors"""
+        # Retries keep their slot, so a rate-limited burst also slows new calls
+        async with self._api_sem:
+            for attempt in range(self.retry_attempts):
+                try:
+                    # Native async call, runs on the event loop instead of a worker thread
+                    response = await self.model.generate_content_async(prompt)
+                    return response.text
+                
+                except (gexc.ResourceExhausted, gexc.TooManyRequests):
+                    if attempt < self.retry_attempts - 1:
+                        # Rate limit hit, back off exponentially with jitter and retry
+                        pause = self.rate_limit_pause * (2 ** attempt) + random.random() * 0.5
+                        self.logger.warning(f"Rate limit hit, pausing for {pause:.1f} seconds")
+                        await asyncio.sleep(pause)
+                        continue
+                    
+                    raise
+                
+                except Exception as e:
+                    if attempt < self.retry_attempts - 1:
+                        # Other error, retry after delay
+                        self.logger.warning(f"API error: {e}, retrying in {self.retry_delay} seconds")
+                        await asyncio.sleep(self.retry_delay)
+                        continue
+                    
+                    # All retries failed, raise the exception
+                    raise
+                
     def _create_analysis_prompt(self, content: Dict[str, Any]) -> str:
         """Create a prompt for content analysis"""
         title = content.get("title", "")
         text = content.get("content", "")
         source = content.get("source_name", "")
         
-        return f"""
-        You are an expert content analyst for a niche industry news syndication service.
-        Analyze the following content from {source} and extract key information.
-        
-        TITLE: {title}
-        
-        CONTENT:
-        {text}
+        return _ANALYSIS_PROMPT.format(
+            source=source,
+            title=title,
+            text=text
+        )
         
-        Provide a detailed analysis in JSON format with the following structure:
-        {{
-            "summary": "Brief 2-3 sentence summary of the content",
-            "key_points": ["List of 3-5 key points from the article"],
-            "entities": ["Important people, companies, products, etc. mentioned"],
-            "industry_relevance": "Assessment of how relevant this is to the industry (High/Medium/Low)",
-            "sentiment": "Overall sentiment of the article (Positive/Negative/Neutral)",
-            "categories": ["List of relevant categories/tags"],
-            "action_items": ["Potential action items for industry professionals"]
-        }}
+    def _create_batch_analysis_prompt(self, batch: List[Tuple[str, Dict[str, Any]]]) -> str:
+        """Create a prompt for analyzing a batch of content items"""
+        items = [
+            {
+                "id": item_id,
+                "source": content.get("source_name", ""),
+                "title": content.get("title", ""),
+                "content": content.get("content", "")
+            }
+            for item_id, content in batch
+        ]
         
-        Return ONLY the JSON without any additional text or explanation.
-        """
+        return _BATCH_ANALYSIS_PROMPT.format(
+            count=len(items),
+            items=orjson.dumps(items, option=orjson.OPT_INDENT_2).decode()
+        )
         
     def _create_enhancement_prompt(self, content: Dict[str, Any], analysis: Dict[str, Any]) -> str:
         """Create a prompt for content enhancement"""
@@ -226,38 +549,12 @@ class GeminiProClient:
         key_points = analysis.get("key_points", [])
         key_points_text = "\n".join([f"- {point}" for point in key_points])
         
-        return f"""
-        You are an expert content editor for a niche industry news syndication service.
-        Enhance the following content based on the provided analysis.
-        
-        ORIGINAL TITLE: {title}
-        
-        ORIGINAL CONTENT:
-        {text}
-        
-        ANALYSIS SUMMARY: {summary}
-        
-        KEY POINTS:
-        {key_points_text}
-        
-        Enhance this content by:
-        1. Creating an improved, attention-grabbing title
-        2. Writing a concise, engaging introduction (1-2 paragraphs)
-        3. Restructuring and enhancing the main content while preserving all factual information
-        4. Adding a conclusion with industry implications
-        5. Adding section headings where appropriate
-        
-        Provide the enhanced content in JSON format with this structure:
-        {{
-            "enhanced_title": "Improved title",
-            "introduction": "Engaging introduction paragraphs",
-            "enhanced_content": "Full enhanced content with HTML formatting",
-            "conclusion": "Added conclusion with industry implications",
-            "suggested_hashtags": ["5-7 relevant hashtags"]
-        }}
-        
-        Return ONLY the JSON without any additional text or explanation.
-        """
+        return _ENHANCEMENT_PROMPT.format(
+            title=title,
+            text=text,
+            summary=summary,
+            key_points_text=key_points_text
+        )
         
     def _create_social_prompt(self, content: Dict[str, Any], platforms: List[str]) -> str:
         """Create a prompt for social media post generation"""
@@ -267,40 +564,28 @@ class GeminiProClient:
         
         platforms_text = ", ".join(platforms)
         
-        return f"""
-        You are a social media expert for a niche industry news syndication service.
-        Create platform-specific posts for the following content.
-        
-        TITLE: {title}
-        
-        INTRODUCTION:
-        {intro}
-        
-        URL: {url}
-        
-        Create engaging social media posts for these platforms: {platforms_text}
-        
-        For each platform, follow these guidelines:
-        - LinkedIn: Professional tone, 1-2 paragraphs, 3-5 hashtags, include URL
-        - Twitter: Concise, engaging, under 280 characters, 1-2 hashtags, include URL
-        - Telegram: Informative summary with key points, include URL
-        
-        Provide the posts in JSON format with this structure:
-        {{
-            "linkedin": "LinkedIn post content",
-            "twitter": "Twitter post content",
-            "telegram": "Telegram post content"
-        }}
+        return _SOCIAL_PROMPT.format(
+            title=title,
+            intro=intro,
+            url=url,
+            platforms_text=platforms_text
+        )
         
-        Only include the platforms requested. Return ONLY the JSON without any additional text.
-        """
+    def _create_process_prompt(self, content: Dict[str, Any], platforms: List[str]) -> str:
+        """Create a combined prompt for analysis, enhancement and social posts"""
+        return _PROCESS_PROMPT.format(
+            source=content.get("source_name", ""),
+            title=content.get("title", ""),
+            text=content.get("content", ""),
+            url=content.get("url", ""),
+            platforms_text=", ".join(platforms)
+        )
         
     def _parse_analysis_result(self, result: str) -> Dict[str, Any]:
         """Parse the analysis result from Gemini"""
         try:
             # Extract JSON from the result
-            json_text = self._extract_json(result)
-            return json.loads(json_text)
+            return self._extract_json(result)
         except Exception as e:
             self.logger.error(f"Error parsing analysis result: {e}")
             return {"error": "Failed to parse analysis result"}
@@ -309,8 +594,7 @@ class GeminiProClient:
         """Parse the enhancement result from Gemini"""
         try:
             # Extract JSON from the result
-            json_text = self._extract_json(result)
-            return json.loads(json_text)
+            return self._extract_json(result)
         except Exception as e:
             self.logger.error(f"Error parsing enhancement result: {e}")
             return {"error": "Failed to parse enhancement result"}
@@ -319,8 +603,7 @@ class GeminiProClient:
         """Parse the social media post generation result"""
         try:
             # Extract JSON from the result
-            json_text = self._extract_json(result)
-            parsed = json.loads(json_text)
+            parsed = self._extract_json(result)
             
             # Ensure we only have the requested platforms
             return {platform: parsed.get(platform, "") for platform in platforms if platform in parsed}
@@ -328,26 +611,33 @@ class GeminiProClient:
             self.logger.error(f"Error parsing social result: {e}")
             return {"error": "Failed to parse social media post results"}
             
-    def _extract_json(self, text: str) -> str:
-        """Extract JSON from text that might contain additional content"""
+    def _extract_json(self, text: str, opener: str = "{") -> Any:
+        """Extract and parse JSON from text that might contain additional content
+        
+        opener is the character the embedded value starts with: "{" for an object,
+        "[" for an array.
+        """
+        # Gemini often wraps its answer in a ```json fence; unwrap it for the fast path
+        text = text.strip()
+        candidate = text
+        if text.startswith("```"):
+            fenced = text[3:].split("```", 1)[0]
+            lang, _, rest = fenced.partition("\n")
+            candidate = (rest if not lang.lstrip().startswith(("{", "[")) else fenced).strip()
+            
         try:
             # Check if the text is already valid JSON
-            json.loads(text)
-            return text
-        except json.JSONDecodeError:
-            # Try to extract JSON from the text
-            # Look for start and end braces
-            start_idx = text.find('{')
-            end_idx = text.rfind('}')
-            
-            if start_idx >= 0 and end_idx > start_idx:
-                json_text = text[start_idx:end_idx+1]
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            # Scan the full text, not just the unwrapped fragment: a "```" inside a
+            # JSON string cuts the fragment short
+            start_idx = text.find(opener)
+            while start_idx != -1:
                 try:
-                    # Validate that this is valid JSON
-                    json.loads(json_text)
-                    return json_text
+                    obj, _ = _DECODER.raw_decode(text, start_idx)
+                    return obj
                 except json.JSONDecodeError:
-                    pass
+                    start_idx = text.find(opener, start_idx + 1)
                     
             # If we get here, we couldn't extract valid JSON
             raise ValueError("Could not extract valid JSON from response")
\ No newline at end of file
@@ -5,11 +5,22 @@ import logging
 import asyncio
 import os
 import json
+import random
 import time
 import httpx
+import orjson
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone
 from urllib.parse import urlencode
+from email.utils import parsedate_to_datetime
+
+# Static parts of every text post; only author and text vary
+_POST_VISIBILITY = {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
+_POST_HEADERS = {"Content-Type": "application/json"}
+
+# Post responses worth retrying by default: rate limited or temporarily unavailable.
+# Other 5xx errors may arrive after the post was created, so resending could duplicate it
+_RETRYABLE_STATUS = frozenset({429, 503})
 
 class LinkedInPublisher:
     """
@@ -24,6 +35,12 @@ class LinkedInPublisher:
         self.api_base_url = "https://api.linkedin.com/v2"
         self.auth_base_url = "https://www.linkedin.com/oauth/v2"
         self.access_token = config.get("access_token", os.environ.get("LINKEDIN_ACCESS_TOKEN"))
+        self._token_expiry: Optional[float] = None  # monotonic time to refresh at, once known
+        self._refresh_lock = asyncio.Lock()
+        self.refresh_backoffs = config.get("refresh_backoffs", (1.0, 2.0, 5.0))  # seconds between refresh retries
+        self.post_retries = config.get("post_retries", 5)  # retries on retryable statuses when posting
+        self.post_retry_statuses = frozenset(config.get("post_retry_statuses", _RETRYABLE_STATUS))
+        self.max_retry_after = config.get("max_retry_after", 300.0)  # cap on server-requested waits, seconds
         self.refresh_token = config.get("refresh_token", os.environ.get("LINKEDIN_REFRESH_TOKEN"))
         self.client_id = config.get("client_id", os.environ.get("LINKEDIN_CLIENT_ID"))
         self.client_secret = config.get("client_secret", os.environ.get("LINKEDIN_CLIENT_SECRET"))
@@ -32,9 +49,21 @@ class LinkedInPublisher:
         # For enterprise clients using organization pages
         self.organization_id = config.get("organization_id", os.environ.get("LINKEDIN_ORG_ID"))
         
+        # Optional JSON file remembering the authenticated user's URN across restarts;
+        # not consulted when posting as an organization page
+        self.author_urn_cache = config.get("author_urn_cache")
+        if not self.author_urn and not self.organization_id:
+            self.author_urn = self._load_cached_author_urn()
+        self._author_lock = asyncio.Lock()
+        
         # Rate limiting parameters
         self.rate_limit = config.get("rate_limit", 3)  # Requests per minute
-        self.last_request_time = 0
+        
+        # Token bucket shared by all concurrent callers: up to rate_limit requests
+        # per minute, refilled continuously
+        self._tokens = float(self.rate_limit)
+        self._last_refill = time.monotonic()
+        self._bucket_lock = asyncio.Lock()
         
         # Validate required configuration
         if not self.client_id or not self.client_secret:
@@ -43,8 +72,21 @@ class LinkedInPublisher:
         if not self.author_urn:
             self.logger.warning("LinkedIn author_urn not provided, posts will be created for the authenticated user")
             
-        # HTTP client with timeouts
+        # HTTP client with timeouts, shared by all requests so connections are reused
         self.timeout = httpx.Timeout(10.0)
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=config.get("max_connections", 10),
+                max_keepalive_connections=config.get("max_keepalive_connections", 5)
+            ),
+            headers={"X-Restli-Protocol-Version": "2.0.0"}
+        )
+        
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self._client.aclose()
         
     async def publish_post(self, content: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -95,6 +137,7 @@ class LinkedInPublisher:
         """
         # Enforce rate limiting
         await self._rate_limit_delay()
+        await self._ensure_fresh_token()
         
         # Determine if posting as person or organization
         author = self.author_urn
@@ -102,7 +145,7 @@ class LinkedInPublisher:
             author = f"urn:li:organization:{self.organization_id}"
         elif not author:
             # Get the current user's URN
-            user_info = await self._get_current_user_info()
+            user_info = await self._resolve_author_urn()
             if not user_info.get("success", False):
                 return user_info
             author = user_info.get("user_urn")
@@ -119,57 +162,132 @@ class LinkedInPublisher:
                     "shareMediaCategory": "NONE"
                 }
             },
-            "visibility": {
-                "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
-            }
+            "visibility": _POST_VISIBILITY
         }
         
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-            "X-Restli-Protocol-Version": "2.0.0"
-        }
+        headers = {**_POST_HEADERS, "Authorization": f"Bearer {self.access_token}"}
+        
+        body = orjson.dumps(payload)
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
+            for attempt in range(self.post_retries + 1):
+                response = await self._client.post(
                     f"{self.api_base_url}/ugcPosts",
                     headers=headers,
-                    json=payload
+                    content=body
                 )
-                
-                if response.status_code == 201:
-                    post_id = response.headers.get("x-restli-id", "unknown")
-                    self.logger.info(f"Successfully published LinkedIn post with ID: {post_id}")
-                    return {
-                        "success": True,
-                        "post_id": post_id,
-                        "platform": "linkedin",
-                        "published_at": datetime.now(timezone.utc).isoformat()
-                    }
-                else:
-                    error_message = f"LinkedIn API error: {response.status_code} - {response.text}"
-                    self.logger.error(error_message)
-                    
-                    # Check for token expiration
-                    if response.status_code == 401:
-                        # Try to refresh the token and retry
-                        refresh_result = await self._refresh_access_token()
-                        if refresh_result.get("success", False):
-                            self.logger.info("Access token refreshed, retrying post")
-                            return await self._create_text_post(text)
-                            
-                    return {
-                        "success": False,
-                        "error": error_message,
-                        "status_code": response.status_code
-                    }
+                if response.status_code not in self.post_retry_statuses or attempt == self.post_retries:
+                    break
                     
+                delay = self._retry_delay(response, attempt)
+                self.logger.warning(
+                    f"LinkedIn API returned {response.status_code}, retrying in {delay:.1f} seconds "
+                    f"(attempt {attempt + 1}/{self.post_retries})"
+                )
+                await asyncio.sleep(delay)
+                
+            if response.status_code == 201:
+                post_id = response.headers.get("x-restli-id", "unknown")
+                self.logger.info(f"Successfully published LinkedIn post with ID: {post_id}")
+                return {
+                    "success": True,
+                    "post_id": post_id,
+                    "platform": "linkedin",
+                    "published_at": datetime.now(timezone.utc).isoformat()
+                }
+            else:
+                error_message = f"LinkedIn API error: {response.status_code} - {response.text}"
+                self.logger.error(error_message)
+                
+                # Check for token expiration
+                if response.status_code == 401:
+                    # Try to refresh the token and retry
+                    refresh_result = await self._refresh_access_token()
+                    if refresh_result.get("success", False):
+                        self.logger.info("Access token refreshed, retrying post")
+                        return await self._create_text_post(text)
+                        
+                return {
+                    "success": False,
+                    "error": error_message,
+                    "status_code": response.status_code
+                }
+                
         except Exception as e:
             error_message = f"Error publishing LinkedIn post: {str(e)}"
             self.logger.error(error_message)
             return {"success": False, "error": error_message}
             
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        """
+        Seconds to wait before retrying, honoring the Retry-After header (capped at
+        max_retry_after) when present
+        
+        Args:
+            response: The response that triggered the retry
+            attempt: Zero-based retry attempt, for the exponential fallback
+            
+        Returns:
+            Delay in seconds
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(self.max_retry_after, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+                return min(self.max_retry_after, max(0.0, delay))
+            except (TypeError, ValueError):
+                pass
+                
+        return min(60.0, 2 ** attempt + random.random())
+        
+    async def _resolve_author_urn(self) -> Dict[str, Any]:
+        """
+        Look up the authenticated user's URN once and remember it
+        
+        Returns:
+            Dictionary with the user URN, or the lookup error
+        """
+        async with self._author_lock:
+            # A concurrent caller may have resolved it while we waited
+            if self.author_urn:
+                return {"success": True, "user_urn": self.author_urn}
+                
+            user_info = await self._get_current_user_info()
+            if user_info.get("success", False):
+                self.author_urn = user_info["user_urn"]
+                self._save_cached_author_urn()
+            return user_info
+            
+    def _load_cached_author_urn(self) -> Optional[str]:
+        """Read the author URN from author_urn_cache, if configured"""
+        if not self.author_urn_cache:
+            return None
+            
+        try:
+            with open(self.author_urn_cache) as f:
+                return json.load(f).get("author_urn")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Could not read LinkedIn author URN cache: {e}")
+            return None
+            
+    def _save_cached_author_urn(self):
+        """Write the author URN to author_urn_cache, if configured"""
+        if not self.author_urn_cache:
+            return
+            
+        try:
+            with open(self.author_urn_cache, "w") as f:
+                json.dump({"author_urn": self.author_urn}, f)
+        except Exception as e:
+            self.logger.warning(f"Could not write LinkedIn author URN cache: {e}")
+            
     async def _get_current_user_info(self) -> Dict[str, Any]:
         """
         Get information about the currently authenticated user
@@ -178,48 +296,60 @@ class LinkedInPublisher:
             Dictionary with user information
         """
         await self._rate_limit_delay()
+        await self._ensure_fresh_token()
         
         headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "X-Restli-Protocol-Version": "2.0.0"
+            "Authorization": f"Bearer {self.access_token}"
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.api_base_url}/me",
-                    headers=headers
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    user_id = data.get("id")
-                    if user_id:
-                        user_urn = f"urn:li:person:{user_id}"
-                        return {
-                            "success": True,
-                            "user_id": user_id,
-                            "user_urn": user_urn
-                        }
-                    else:
-                        return {
-                            "success": False,
-                            "error": "User ID not found in response"
-                        }
+            response = await self._client.get(
+                f"{self.api_base_url}/me",
+                headers=headers
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                user_id = data.get("id")
+                if user_id:
+                    user_urn = f"urn:li:person:{user_id}"
+                    return {
+                        "success": True,
+                        "user_id": user_id,
+                        "user_urn": user_urn
+                    }
                 else:
-                    error_message = f"LinkedIn API error: {response.status_code} - {response.text}"
-                    self.logger.error(error_message)
                     return {
                         "success": False,
-                        "error": error_message,
-                        "status_code": response.status_code
+                        "error": "User ID not found in response"
                     }
-                    
+            else:
+                error_message = f"LinkedIn API error: {response.status_code} - {response.text}"
+                self.logger.error(error_message)
+                return {
+                    "success": False,
+                    "error": error_message,
+                    "status_code": response.status_code
+                }
+                
         except Exception as e:
             error_message = f"Error getting LinkedIn user info: {str(e)}"
             self.logger.error(error_message)
             return {"success": False, "error": error_message}
             
+    async def _ensure_fresh_token(self):
+        """
+        Refresh the access token ahead of time if it is about to expire
+        """
+        if self._token_expiry is None or time.monotonic() < self._token_expiry:
+            return
+            
+        async with self._refresh_lock:
+            # Another caller may have refreshed it while we waited
+            if self._token_expiry is not None and time.monotonic() >= self._token_expiry:
+                self.logger.info("LinkedIn access token about to expire, refreshing")
+                await self._refresh_access_token()
+                
     async def _refresh_access_token(self) -> Dict[str, Any]:
         """
         Refresh the LinkedIn access token using the refresh token
@@ -241,31 +371,50 @@ class LinkedInPublisher:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.auth_base_url}/accessToken",
-                    data=params
+            # Retry transient failures (network errors, 5xx); 4xx such as invalid_grant is fatal
+            for attempt, backoff in enumerate((*self.refresh_backoffs, None), start=1):
+                try:
+                    response = await self._client.post(
+                        f"{self.auth_base_url}/accessToken",
+                        data=params
+                    )
+                    if response.status_code < 500 or backoff is None:
+                        break
+                    reason = f"HTTP {response.status_code}"
+                except httpx.TransportError as e:
+                    if backoff is None:
+                        raise
+                    reason = str(e)
+                    
+                self.logger.warning(
+                    f"LinkedIn token refresh attempt {attempt} failed ({reason}), retrying in {backoff} seconds"
                 )
+                await asyncio.sleep(backoff)
+                
+            if response.status_code == 200:
+                data = response.json()
+                self.access_token = data.get("access_token")
+                new_refresh_token = data.get("refresh_token")
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    self.access_token = data.get("access_token")
-                    new_refresh_token = data.get("refresh_token")
+                if new_refresh_token:
+                    self.refresh_token = new_refresh_token
                     
-                    if new_refresh_token:
-                        self.refresh_token = new_refresh_token
-                        
-                    self.logger.info("Successfully refreshed LinkedIn access token")
-                    return {"success": True}
-                else:
-                    error_message = f"LinkedIn token refresh error: {response.status_code} - {response.text}"
-                    self.logger.error(error_message)
-                    return {
-                        "success": False,
-                        "error": error_message,
-                        "status_code": response.status_code
-                    }
+                # Refresh a minute before the token actually expires
+                expires_in = data.get("expires_in")
+                if expires_in:
+                    self._token_expiry = time.monotonic() + expires_in - 60
                     
+                self.logger.info("Successfully refreshed LinkedIn access token")
+                return {"success": True}
+            else:
+                error_message = f"LinkedIn token refresh error: {response.status_code} - {response.text}"
+                self.logger.error(error_message)
+                return {
+                    "success": False,
+                    "error": error_message,
+                    "status_code": response.status_code
+                }
+                
         except Exception as e:
             error_message = f"Error refreshing LinkedIn token: {str(e)}"
             self.logger.error(error_message)
@@ -275,15 +424,18 @@ class LinkedInPublisher:
         """
         Enforce API rate limits by adding delays between requests
         """
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
         # LinkedIn's rate limits are per-minute, so we'll pace ourselves
-        min_interval = 60.0 / self.rate_limit  # seconds between requests
-        
-        if time_since_last < min_interval:
-            delay = min_interval - time_since_last
+        async with self._bucket_lock:
+            now = time.monotonic()
+            refill = (now - self._last_refill) * self.rate_limit / 60.0
+            self._tokens = min(float(self.rate_limit), self._tokens + refill)
+            self._last_refill = now
+            
+            # Reserve a token now, even if that puts the bucket in debt, so
+            # waiters are served in order without re-checking after the sleep
+            self._tokens -= 1
+            delay = -self._tokens * 60.0 / self.rate_limit if self._tokens < 0 else 0
+            
+        if delay:
             self.logger.debug(f"Rate limiting: Waiting {delay:.2f} seconds before LinkedIn API request")
             await asyncio.sleep(delay)
-            
-        self.last_request_time = time.time()
\ No newline at end of file
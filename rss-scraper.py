@@ -3,17 +3,104 @@
 
 import feedparser
 import asyncio
+import json
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 from dateutil.parser import parse as parse_date
+import ciso8601
+import diskcache
 from bs4 import BeautifulSoup
 import re
+from io import BytesIO
+from urllib.parse import urljoin
+from lxml import etree
 
 from .base_scraper import BaseScraper, ContentItem
 
+def _fast_parse_date(value: str) -> datetime:
+    """Parse ISO 8601 dates with ciso8601 (C), falling back to dateutil for anything else"""
+    try:
+        return ciso8601.parse_datetime(value)
+    except ValueError:
+        return parse_date(value)
+
+def _extract_links_streaming(feed_content: str, feed_url: str) -> Optional[List[str]]:
+    """Extract entry links from an RSS/Atom feed in one streaming pass
+    
+    Only each <item>/<entry> is materialized, and it is discarded once its link has
+    been read. Relative links are resolved against xml:base and the feed URL, and an
+    RSS <guid> that is a permalink stands in for a missing <link>, as in feedparser.
+    Returns None if the feed is not well-formed XML or any entry has no usable link,
+    so the caller can fall back to feedparser.
+    """
+    urls = []
+    try:
+        # The body is already decoded; override any encoding in the XML declaration
+        events = etree.iterparse(
+            BytesIO(feed_content.encode("utf-8")),
+            events=("end",),
+            tag=("{*}item", "{*}entry"),
+            encoding="utf-8",
+            resolve_entities=False,
+            no_network=True
+        )
+        for _, entry in events:
+            link = None
+            link_el = None
+            permalink = None
+            for child in entry:
+                if not isinstance(child.tag, str):
+                    continue
+                name = etree.QName(child).localname
+                if name == "guid":
+                    if child.get("isPermaLink", "true").lower() != "false" and child.text:
+                        permalink = child.text.strip()
+                    continue
+                if name != "link":
+                    continue
+                if child.get("href"):
+                    # Atom: prefer the alternate link, like feedparser does
+                    if child.get("rel", "alternate") == "alternate":
+                        link, link_el = child.get("href"), child
+                        break
+                    if not link:
+                        link, link_el = child.get("href"), child
+                elif child.text and child.text.strip():
+                    link, link_el = child.text.strip(), child
+                    break
+                    
+            if link:
+                link = urljoin(urljoin(feed_url, link_el.base or ""), link)
+            elif permalink and permalink.startswith(("http://", "https://")):
+                link = permalink
+            else:
+                return None
+            urls.append(link)
+                
+            # Free the entry and any already-processed siblings
+            entry.clear()
+            while entry.getprevious() is not None:
+                del entry.getparent()[0]
+                
+    except etree.XMLSyntaxError:
+        return None
+        
+    return urls
+
+# Class-name patterns used by the _extract_* helpers
+_RX_TITLE = re.compile(r'(title|header|heading)')
+_RX_CONTENT = re.compile(r'(content|article|post)')
+_RX_AUTHOR = re.compile(r'(author|byline|writer)')
+_RX_DATE_CLASSES = tuple(re.compile(cls) for cls in ('date', 'published', 'time', 'timestamp'))
+_RX_TAG = re.compile(r'(tag|category)')
+
 class RssScraper(BaseScraper):
-    """Scraper for RSS feed sources"""
+    """Scraper for RSS feed sources
+    
+    Feeds are fetched through BaseScraper's shared, pooled session, so feeds hosted on
+    the same CDN reuse keep-alive connections across sources and polls.
+    """
     
     def __init__(self, source_config: Dict[str, Any]):
         super().__init__(source_config)
@@ -21,49 +108,119 @@ class RssScraper(BaseScraper):
         self.max_age_days = source_config.get("max_age_days", 7)
         self.min_content_length = source_config.get("min_content_length", 100)
         
+        # Per-feed HTTP validators and the URLs found last time: (etag, last_modified, urls)
+        self.feed_cache_path = source_config.get("feed_cache_path")
+        self._feed_cache: Dict[str, Tuple[Optional[str], Optional[str], List[str]]] = self._load_feed_cache()
+        
+        # Optional persistent set of article URLs already parsed, so later polls skip them.
+        # Entries expire after max_age_days, when the article would be too old anyway.
+        seen_cache_dir = source_config.get("seen_cache_dir")
+        self._seen: Optional[diskcache.Cache] = diskcache.Cache(seen_cache_dir) if seen_cache_dir else None
+        
     async def discover_urls(self) -> List[str]:
         """Discover article URLs from RSS feeds"""
+        # Fetch all feeds concurrently; fetch_url enforces rate and concurrency limits
+        results = await asyncio.gather(
+            *(self._discover_feed_urls(feed_url) for feed_url in self.feed_urls),
+            return_exceptions=True
+        )
+        
         all_urls = []
+        for feed_url, urls in zip(self.feed_urls, results):
+            if isinstance(urls, Exception):
+                self.logger.error(f"Error processing feed {feed_url}: {urls}")
+                continue
+            all_urls.extend(urls)
+            
+        self._save_feed_cache()
         
-        for feed_url in self.feed_urls:
-            self.logger.info(f"Fetching RSS feed: {feed_url}")
+        # Remove duplicates while preserving order
+        unique_urls = list(dict.fromkeys(all_urls))
+        
+        # Skip articles parsed on a previous poll
+        if self._seen is not None:
+            new_urls = [url for url in unique_urls if url not in self._seen]
+            self.logger.info(f"Skipping {len(unique_urls) - len(new_urls)} already seen URLs")
+            return new_urls
             
-            try:
-                # Fetch RSS feed content
-                feed_content = await self.fetch_url(feed_url)
-                if not feed_content:
-                    continue
-                    
-                # Parse feed with feedparser
-                feed = feedparser.parse(feed_content)
+        return unique_urls
+        
+    async def _discover_feed_urls(self, feed_url: str) -> List[str]:
+        """Fetch a single RSS feed and return its article URLs"""
+        self.logger.info(f"Fetching RSS feed: {feed_url}")
+        
+        # Fetch RSS feed content, revalidating against the previous poll
+        headers = dict(self.headers)
+        etag, last_modified, cached_urls = self._feed_cache.get(feed_url, (None, None, []))
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+            
+        status, feed_content, response_headers = await self.fetch_response(feed_url, headers=headers)
+        if status == 304:
+            self.logger.info(f"Feed not modified, reusing {len(cached_urls)} URLs: {feed_url}")
+            return cached_urls
+        if not feed_content:
+            return []
+            
+        # Stream entry links out of the feed in a worker thread so it doesn't block the event loop
+        urls = await asyncio.to_thread(_extract_links_streaming, feed_content, feed_url)
+        
+        if not urls:
+            # Fall back to feedparser for malformed or unusual feeds
+            urls = []
+            feed = await asyncio.to_thread(feedparser.parse, feed_content)
+            
+            # Check if feed parsing was successful
+            if not feed or not feed.entries:
+                self.logger.warning(f"No entries found in feed: {feed_url}")
+                return []
                 
-                # Check if feed parsing was successful
-                if not feed or not feed.entries:
-                    self.logger.warning(f"No entries found in feed: {feed_url}")
-                    continue
+            # Extract article URLs
+            for entry in feed.entries:
+                if 'link' in entry:
+                    urls.append(entry.link)
                     
-                # Extract article URLs
-                urls = []
-                for entry in feed.entries:
-                    if 'link' in entry:
-                        urls.append(entry.link)
-                        
-                self.logger.info(f"Found {len(urls)} URLs in feed: {feed_url}")
-                all_urls.extend(urls)
-                
-            except Exception as e:
-                self.logger.error(f"Error processing feed {feed_url}: {e}")
-                
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_urls = [url for url in all_urls if not (url in seen or seen.add(url))]
+        self.logger.info(f"Found {len(urls)} URLs in feed: {feed_url}")
         
-        return unique_urls
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if etag or last_modified:
+            self._feed_cache[feed_url] = (etag, last_modified, urls)
+            
+        return urls
+        
+    def _load_feed_cache(self) -> Dict[str, Tuple[Optional[str], Optional[str], List[str]]]:
+        """Load feed validators from feed_cache_path, if configured"""
+        if not self.feed_cache_path:
+            return {}
+            
+        try:
+            with open(self.feed_cache_path) as f:
+                return {url: tuple(entry) for url, entry in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"Could not read feed cache: {e}")
+            return {}
+            
+    def _save_feed_cache(self):
+        """Write feed validators to feed_cache_path, if configured"""
+        if not self.feed_cache_path:
+            return
+            
+        try:
+            with open(self.feed_cache_path, "w") as f:
+                json.dump(self._feed_cache, f)
+        except Exception as e:
+            self.logger.warning(f"Could not write feed cache: {e}")
         
     async def parse_content(self, url: str, html: str) -> Optional[ContentItem]:
         """Parse content from HTML and return ContentItem"""
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            # lxml is a C parser, several times faster than html.parser on large pages
+            soup = BeautifulSoup(html, 'lxml')
             
             # Extract title
             title = self._extract_title(soup)
@@ -104,6 +261,9 @@ class RssScraper(BaseScraper):
                 self.logger.warning(f"Content validation failed for {url}")
                 return None
                 
+            if self._seen is not None:
+                self._seen.set(url, True, expire=self.max_age_days * 86400)
+                
             return content_item
             
         except Exception as e:
@@ -114,7 +274,7 @@ class RssScraper(BaseScraper):
         """Extract title from page"""
         # Try multiple approaches
         # 1. Check article header
-        article_header = soup.find('h1', class_=re.compile('(title|header|heading)'))
+        article_header = soup.find('h1', class_=_RX_TITLE)
         if article_header and article_header.text.strip():
             return article_header.text.strip()
             
@@ -151,10 +311,11 @@ class RssScraper(BaseScraper):
             
         # Check for content with specific classes
         if not main_content:
-            content_candidates = soup.find_all(['div', 'section'], class_=re.compile('(content|article|post)'))
+            content_candidates = soup.find_all(['div', 'section'], class_=_RX_CONTENT)
             if content_candidates:
-                # Choose the longest content
-                main_content = max(content_candidates, key=lambda x: len(x.get_text()))
+                # Choose the longest content; summing string lengths gives len(get_text())
+                # without concatenating each candidate's whole subtree
+                main_content = max(content_candidates, key=lambda x: sum(map(len, x.strings)))
                 
         # Extract text from main content
         if main_content:
@@ -163,13 +324,13 @@ class RssScraper(BaseScraper):
                 unwanted.decompose()
                 
             # Extract text with paragraph structure
-            content = ""
+            paragraphs = []
             for p in main_content.find_all('p'):
                 p_text = p.get_text().strip()
-                if p_text and len(p_text) > 20:  # Skip short paragraphs
-                    content += p_text + "\n\n"
+                if len(p_text) > 20:  # Skip short paragraphs
+                    paragraphs.append(p_text)
                     
-            return content.strip()
+            return "\n\n".join(paragraphs)
             
         # Fallback: extract all paragraphs from body
         paragraphs = []
@@ -197,11 +358,9 @@ class RssScraper(BaseScraper):
             return author_elem.text.strip()
             
         # 3. Look for common author classes
-        author_classes = ['author', 'byline', 'writer']
-        for cls in author_classes:
-            author_elem = soup.find(class_=re.compile(cls))
-            if author_elem:
-                return author_elem.text.strip()
+        author_elem = soup.find(class_=_RX_AUTHOR)
+        if author_elem:
+            return author_elem.text.strip()
                 
         return None
         
@@ -212,25 +371,25 @@ class RssScraper(BaseScraper):
         time_elem = soup.find('time')
         if time_elem and time_elem.get('datetime'):
             try:
-                return parse_date(time_elem['datetime'])
+                return _fast_parse_date(time_elem['datetime'])
             except ValueError:
                 pass
                 
         # 2. Look for metadata
-        for meta in soup.find_all('meta'):
-            if meta.get('property') in ['article:published_time', 'og:published_time']:
+        for prop in ('article:published_time', 'og:published_time'):
+            meta = soup.find('meta', {'property': prop})
+            if meta and meta.get('content'):
                 try:
-                    return parse_date(meta['content'])
+                    return _fast_parse_date(meta['content'])
                 except ValueError:
                     pass
                     
         # 3. Look for dates in text
-        date_classes = ['date', 'published', 'time', 'timestamp']
-        for cls in date_classes:
-            date_elem = soup.find(class_=re.compile(cls))
+        for date_class in _RX_DATE_CLASSES:
+            date_elem = soup.find(class_=date_class)
             if date_elem:
                 try:
-                    return parse_date(date_elem.text.strip())
+                    return _fast_parse_date(date_elem.text.strip())
                 except ValueError:
                     pass
                     
@@ -247,7 +406,7 @@ class RssScraper(BaseScraper):
             tags.extend([k.strip() for k in keywords if k.strip()])
             
         # 2. Look for tag elements
-        tag_elements = soup.find_all(['a', 'span'], class_=re.compile('(tag|category)'))
+        tag_elements = soup.find_all(['a', 'span'], class_=_RX_TAG)
         for tag in tag_elements:
             tag_text = tag.text.strip()
             if tag_text and tag_text not in tags:
@@ -1,27 +1,95 @@
 # Telegram Bot for Monitoring
 # src/monitoring/modules/telegram_bot.py
 
+from __future__ import annotations
+
 import logging
 import asyncio
 import os
-import json
 import time
-from typing import Dict, Any, Optional, List, Callable
+import orjson
+from typing import Dict, Any, Optional, List, Callable, TYPE_CHECKING
 from datetime import datetime, timezone
-import telegram
-from telegram import Update, ParseMode
-from telegram.ext import (
-    Application,
-    CommandHandler,
-    MessageHandler,
-    filters,
-    ContextTypes,
-    CallbackContext
+
+# telegram is imported when the bot starts, so loading this module stays cheap
+if TYPE_CHECKING:
+    from telegram import Update
+    from telegram.ext import ContextTypes
+
+# Emoji for status and message types, shared by all status renderings
+STATUS_EMOJI = {
+    "running": "✅",
+    "success": "✅",
+    "degraded": "⚠️",
+    "warning": "⚠️",
+    "error": "🚨",
+    "critical": "🚨",
+    "alert": "🚨",
+}
+DEFAULT_EMOJI = "❓"
+INFO_EMOJI = "ℹ️"
+
+# Severity of broadcast types, used to headline a batch of coalesced updates
+STATUS_SEVERITY = {
+    "warning": 1,
+    "degraded": 1,
+    "error": 2,
+    "critical": 3,
+    "alert": 3,
+}
+
+# Static replies for /start and /help
+_START_HTML = (
+    "👋 <b>Welcome to the Niche Content Syndication Monitor</b>\n\n"
+    "This bot helps you monitor the status of your content syndication system.\n\n"
+    "Use /help to see available commands."
+)
+_HELP_HTML = (
+    "<b>Available Commands</b>\n\n"
+    "/status - Show current system status\n"
+    "/services - List all services and their status\n"
+    "/metrics - Show system performance metrics\n"
+    "/help - Show this help message"
 )
 
+# Display format for timestamps, rendered once at write time
+DISPLAY_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def _set_now_fields(d: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Stamp d with now (default: current UTC time) as both ISO and display strings"""
+    if now is None:
+        now = datetime.now(timezone.utc)
+    d["last_update"] = now.isoformat()
+    d["last_update_display"] = now.strftime(DISPLAY_TIME_FORMAT)
+    return d
+
+def _with_display_time(status: Dict[str, Any]) -> Dict[str, Any]:
+    """Return status with last_update_display derived from its ISO last_update, if any"""
+    last_update = status.get("last_update")
+    if "last_update_display" in status or not isinstance(last_update, str):
+        return status
+    try:
+        display = datetime.fromisoformat(last_update).strftime(DISPLAY_TIME_FORMAT)
+    except ValueError:
+        return status
+    return {**status, "last_update_display": display}
+
 class MonitoringBot:
     """Telegram bot for system monitoring and status updates"""
     
+    # Fixed attribute layout; new instance attributes must be listed here
+    __slots__ = (
+        "logger", "token", "allowed_user_ids", "allowed_chat_ids",
+        "system_status", "service_callbacks",
+        "broadcast_cache_ttl", "_last_broadcast_cache",
+        "broadcast_coalesce_window", "_pending_statuses", "_flush_task",
+        "_out_q", "_send_interval", "_sender",
+        "_svc_cache_ttl", "_svc_cache_ts",
+        "_service_error_states", "_error_count",
+        "webhook_url", "webhook_port", "poll_interval", "long_poll_timeout",
+        "application",
+    )
+    
     def __init__(self, config: Dict[str, Any], service_callbacks: Dict[str, Callable] = None):
         self.logger = logging.getLogger("monitoring.telegram")
         
@@ -33,45 +101,107 @@ class MonitoringBot:
         self.allowed_user_ids = config.get("allowed_user_ids", [])
         self.allowed_chat_ids = config.get("allowed_chat_ids", [])
         
-        # Convert string IDs to integers if needed
-        self.allowed_user_ids = [int(uid) if isinstance(uid, str) else uid for uid in self.allowed_user_ids]
-        self.allowed_chat_ids = [int(cid) if isinstance(cid, str) else cid for cid in self.allowed_chat_ids]
+        # Convert string IDs to integers if needed; frozensets make auth checks O(1)
+        self.allowed_user_ids = frozenset(int(uid) if isinstance(uid, str) else uid for uid in self.allowed_user_ids)
+        self.allowed_chat_ids = frozenset(int(cid) if isinstance(cid, str) else cid for cid in self.allowed_chat_ids)
         
         # Status information
-        self.system_status = {
+        self.system_status = _set_now_fields({
             "status": "initializing",
-            "last_update": datetime.now(timezone.utc).isoformat(),
             "services": {},
             "metrics": {}
-        }
+        })
         
         # Service callbacks for dynamic status information
         self.service_callbacks = service_callbacks or {}
         
+        # Last rendered broadcast as (status key, monotonic time, message), reused for
+        # identical statuses arriving within broadcast_cache_ttl seconds
+        self.broadcast_cache_ttl = config.get("broadcast_cache_ttl", 5.0)
+        self._last_broadcast_cache: Optional[tuple] = None
+        
+        # Status updates are merged for this many seconds before being broadcast (0 disables)
+        self.broadcast_coalesce_window = config.get("broadcast_coalesce_window", 2.0)
+        self._pending_statuses: List[Dict[str, Any]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        
+        # Outbound messages as (chat_ids, text, parse_mode), drained by a single sender task
+        self._out_q: asyncio.Queue = asyncio.Queue(maxsize=config.get("send_queue_size", 1000))
+        self._send_interval = 1.0 / config.get("send_rate_limit", 30)  # Telegram allows ~30 msg/s per bot
+        self._sender: Optional[asyncio.Task] = None
+        
+        # Service callback results are reused for this many seconds across commands
+        self._svc_cache_ttl = config.get("service_cache_ttl", 5.0)
+        self._svc_cache_ts = 0.0
+        
+        # Per-service error flags and how many are set, kept in step with services
+        self._service_error_states: Dict[str, bool] = {}
+        self._error_count = 0
+        
+        # Webhook mode is used when a public URL is configured, polling otherwise
+        self.webhook_url = config.get("webhook_url")
+        self.webhook_port = config.get("webhook_port", 8443)
+        self.poll_interval = config.get("poll_interval", 0.0)  # Pause between getUpdates calls
+        self.long_poll_timeout = config.get("long_poll_timeout", 30)  # Seconds Telegram holds each poll open
+        
         # Initialize the bot application
         self.application = None
         
     async def start(self):
         """Start the Telegram bot"""
         try:
+            from telegram.ext import Application, CommandHandler, MessageHandler, filters
+            
             # Create the application
             self.application = Application.builder().token(self.token).build()
             
+            # Only allowed users/chats reach the handlers; empty filters match nobody
+            if not self.allowed_user_ids and not self.allowed_chat_ids:
+                self.logger.warning("No allowed user IDs or chat IDs configured, denying access")
+            allowed = (
+                filters.User(user_id=list(self.allowed_user_ids)) |
+                filters.Chat(chat_id=list(self.allowed_chat_ids))
+            )
+            # Passing filters= replaces CommandHandler's default update-type filter; limit
+            # to new messages, since channel posts and edits leave update.message as None
+            auth_filter = filters.UpdateType.MESSAGE & allowed
+            
             # Add handlers
-            self.application.add_handler(CommandHandler("start", self.cmd_start))
-            self.application.add_handler(CommandHandler("status", self.cmd_status))
-            self.application.add_handler(CommandHandler("help", self.cmd_help))
-            self.application.add_handler(CommandHandler("metrics", self.cmd_metrics))
-            self.application.add_handler(CommandHandler("services", self.cmd_services))
+            self.application.add_handler(CommandHandler("start", self.cmd_start, filters=auth_filter))
+            self.application.add_handler(CommandHandler("status", self.cmd_status, filters=auth_filter))
+            self.application.add_handler(CommandHandler("help", self.cmd_help, filters=auth_filter))
+            self.application.add_handler(CommandHandler("metrics", self.cmd_metrics, filters=auth_filter))
+            self.application.add_handler(CommandHandler("services", self.cmd_services, filters=auth_filter))
+            
+            # Rejected commands fall through to a lower-priority group so they are still audited
+            self.application.add_handler(
+                MessageHandler(
+                    filters.UpdateType.MESSAGE & filters.COMMAND & ~allowed, self._log_unauthorized
+                ), group=1
+            )
             
             # Start the bot
             self.logger.info("Starting Telegram bot")
             await self.application.initialize()
             await self.application.start()
-            await self.application.updater.start_polling()
+            if self.webhook_url:
+                await self.application.updater.start_webhook(
+                    listen="0.0.0.0",
+                    port=self.webhook_port,
+                    url_path=self.token,
+                    webhook_url=f"{self.webhook_url.rstrip('/')}/{self.token}"
+                )
+            else:
+                await self.application.updater.start_polling(
+                    poll_interval=self.poll_interval,
+                    timeout=self.long_poll_timeout,
+                    bootstrap_retries=-1
+                )
+            
+            self._sender = asyncio.create_task(self._sender_loop())
             
             self.system_status["status"] = "running"
-            self.system_status["last_update"] = datetime.now(timezone.utc).isoformat()
+            _set_now_fields(self.system_status)
             self.logger.info("Telegram bot started successfully")
             
         except Exception as e:
@@ -82,14 +212,35 @@ class MonitoringBot:
         """Stop the Telegram bot"""
         if self.application:
             self.logger.info("Stopping Telegram bot")
+            
+            # Send any coalesced broadcast now rather than dropping it
+            if self._flush_task:
+                self._flush_task.cancel()
+                self._flush_task = None
+                statuses, self._pending_statuses = self._pending_statuses, []
+                if statuses:
+                    await self._send_status(statuses)
+                    
+            # Give queued messages a moment to go out, then stop the sender
+            if self._sender:
+                try:
+                    await asyncio.wait_for(self._out_q.join(), timeout=5.0)
+                except asyncio.TimeoutError:
+                    self.logger.warning(f"Dropping {self._out_q.qsize()} unsent messages")
+                self._sender.cancel()
+                self._sender = None
+                
             await self.application.updater.stop()
             await self.application.stop()
             await self.application.shutdown()
             self.logger.info("Telegram bot stopped")
             
-    async def send_message(self, message: str, chat_id: int = None, parse_mode: str = ParseMode.HTML) -> bool:
+    async def send_message(self, message: str, chat_id: int = None, parse_mode: str = "HTML") -> bool:
         """
-        Send a message to a specific chat or all allowed chats
+        Queue a message for a specific chat or all allowed chats
+        
+        Messages are delivered in order by the sender task, paced to stay
+        within Telegram's global rate limit.
         
         Args:
             message: The message to send
@@ -97,82 +248,144 @@ class MonitoringBot:
             parse_mode: Parse mode for message formatting
             
         Returns:
-            True if message was sent, False otherwise
+            True if message was queued, False otherwise
         """
         if chat_id is not None:
             # Send to specific chat
             if chat_id not in self.allowed_chat_ids:
                 self.logger.warning(f"Attempted to send message to unauthorized chat ID: {chat_id}")
                 return False
+            chat_ids = (chat_id,)
+        else:
+            # Send to all allowed chats
+            chat_ids = tuple(self.allowed_chat_ids)
+            if not chat_ids:
+                return False
                 
+        # Without a running sender nothing drains the queue, and a full queue would block forever
+        if self._sender is None or self._sender.done():
+            self.logger.warning("Telegram bot is not running, message not sent")
+            return False
+            
+        # Waits when the queue is full, pushing back on callers
+        await self._out_q.put((chat_ids, message, parse_mode))
+        return True
+        
+    async def _sender_loop(self):
+        """Deliver queued messages one at a time, sending each to its chats concurrently"""
+        while True:
+            chat_ids, message, parse_mode = await self._out_q.get()
             try:
-                await self.application.bot.send_message(
-                    chat_id=chat_id,
-                    text=message,
-                    parse_mode=parse_mode
+                results = await asyncio.gather(
+                    *(
+                        self.application.bot.send_message(
+                            chat_id=target_chat,
+                            text=message,
+                            parse_mode=parse_mode
+                        )
+                        for target_chat in chat_ids
+                    ),
+                    return_exceptions=True
                 )
-                return True
                 
-            except Exception as e:
-                self.logger.error(f"Failed to send message to chat {chat_id}: {e}")
-                return False
+                failures = [
+                    (target_chat, result)
+                    for target_chat, result in zip(chat_ids, results)
+                    if isinstance(result, Exception)
+                ]
+                if failures and self.logger.isEnabledFor(logging.ERROR):
+                    self.logger.error("Failed to send message to chats: %s", failures)
+            finally:
+                self._out_q.task_done()
                 
-        else:
-            # Send to all allowed chats
-            success = False
-            for allowed_chat in self.allowed_chat_ids:
-                try:
-                    await self.application.bot.send_message(
-                        chat_id=allowed_chat,
-                        text=message,
-                        parse_mode=parse_mode
-                    )
-                    success = True
-                    
-                except Exception as e:
-                    self.logger.error(f"Failed to send message to chat {allowed_chat}: {e}")
-                    
-            return success
+            # One send slot per chat messaged keeps us under the global limit
+            await asyncio.sleep(len(chat_ids) * self._send_interval)
             
     async def broadcast_status_update(self, status: Dict[str, Any]) -> bool:
         """
         Broadcast a status update to all allowed chats
         
+        Updates arriving within broadcast_coalesce_window seconds of each other
+        are sent together as a single message.
+        
         Args:
             status: Status information to broadcast
             
         Returns:
-            True if message was broadcast to at least one chat, False otherwise
+            True if the update was queued for broadcast, False otherwise
         """
         # Update internal status
         self.system_status.update(status)
-        self.system_status["last_update"] = datetime.now(timezone.utc).isoformat()
+        _set_now_fields(self.system_status)
         
-        # Format status message
-        status_type = status.get("type", "info")
-        status_message = status.get("message", "Status update")
-        details = status.get("details", {})
-        
-        if status_type == "alert":
-            emoji = "🚨"
-        elif status_type == "warning":
-            emoji = "⚠️"
-        elif status_type == "success":
-            emoji = "✅"
-        else:
-            emoji = "ℹ️"
+        if self.broadcast_coalesce_window <= 0:
+            return await self._send_status([status])
+            
+        self._pending_statuses.append(status)
+        
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after(self.broadcast_coalesce_window))
+        return True
+        
+    async def _flush_after(self, delay: float):
+        """Wait for the coalescing window to close, then send the pending updates"""
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        statuses, self._pending_statuses = self._pending_statuses, []
+        if statuses:
+            # Nobody awaits this task, so report failures here rather than losing them
+            try:
+                await self._send_status(statuses)
+            except Exception as e:
+                self.logger.error(f"Failed to broadcast {len(statuses)} coalesced status updates: {e}")
+                
+    async def _send_status(self, statuses: List[Dict[str, Any]]) -> bool:
+        """Render one or more status updates as a single message and send it to all allowed chats"""
+        # Reuse the rendered message if the same statuses were just broadcast
+        status_key = hash(orjson.dumps(
+            statuses, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str
+        ))
+        now = time.monotonic()
+        cached = self._last_broadcast_cache
+        if cached and cached[0] == status_key and now - cached[1] < self.broadcast_cache_ttl:
+            return await self.send_message(cached[2])
             
-        message = f"{emoji} <b>{status_message}</b>\n\n"
+        parts = []
         
-        if details:
-            for key, value in details.items():
-                if isinstance(value, dict) or isinstance(value, list):
-                    value_str = json.dumps(value, indent=2)
-                    message += f"<b>{key}:</b>\n<pre>{value_str}</pre>\n"
-                else:
-                    message += f"<b>{key}:</b> {value}\n"
-                    
-        message += f"\n<i>Updated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</i>"
+        # Headline a batch with its most severe type so alerts stay visible
+        if len(statuses) > 1:
+            worst = max(
+                (s.get("type", "info") for s in statuses),
+                key=lambda t: STATUS_SEVERITY.get(t, 0)
+            )
+            emoji = STATUS_EMOJI.get(worst, INFO_EMOJI)
+            parts.append(f"{emoji} <b>{len(statuses)} status updates</b>\n\n")
+            
+        # Format each status message
+        for i, status in enumerate(statuses):
+            status_type = status.get("type", "info")
+            status_message = status.get("message", "Status update")
+            details = status.get("details", {})
+            
+            emoji = STATUS_EMOJI.get(status_type, INFO_EMOJI)
+            
+            if i:
+                parts.append("\n")
+            parts.append(f"{emoji} <b>{status_message}</b>\n\n")
+            
+            if details:
+                for key, value in details.items():
+                    if isinstance(value, dict) or isinstance(value, list):
+                        value_str = orjson.dumps(
+                            value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str
+                        ).decode()
+                        parts.append(f"<b>{key}:</b>\n<pre>{value_str}</pre>\n")
+                    else:
+                        parts.append(f"<b>{key}:</b> {value}\n")
+                        
+        parts.append(f"\n<i>Updated at {self.system_status['last_update_display']}</i>")
+        message = "".join(parts)
+        self._last_broadcast_cache = (status_key, now, message)
         
         # Send to all chats
         return await self.send_message(message)
@@ -185,28 +398,29 @@ class MonitoringBot:
             service_name: Name of the service
             status: Status information for the service
         """
-        # Update service status
-        self.system_status["services"][service_name] = {
-            **status,
-            "last_update": datetime.now(timezone.utc).isoformat()
-        }
+        now = datetime.now(timezone.utc)
         
-        # Update overall system status
-        all_services = self.system_status["services"].values()
-        
-        # Check for service errors
-        service_errors = [
-            s for s in all_services 
-            if s.get("status") == "error" or s.get("status") == "critical"
-        ]
+        # Replace the service status with a fresh copy; status may be the stored dict itself
+        service = _set_now_fields(dict(status), now)
+        self.system_status["services"][service_name] = service
+        self._track_service_error(service_name, service)
         
-        if service_errors:
+        # Update overall system status
+        if self._error_count:
             self.system_status["status"] = "degraded"
         else:
             self.system_status["status"] = "running"
             
-        self.system_status["last_update"] = datetime.now(timezone.utc).isoformat()
-        
+        _set_now_fields(self.system_status, now)
+        
+    def _track_service_error(self, service_name: str, status: Dict[str, Any]):
+        """Adjust the error count when a service enters or leaves an error state"""
+        was_error = self._service_error_states.get(service_name, False)
+        is_error = status.get("status") in ("error", "critical")
+        if was_error != is_error:
+            self._error_count += 1 if is_error else -1
+            self._service_error_states[service_name] = is_error
+            
     def update_metrics(self, metrics: Dict[str, Any]):
         """
         Update system metrics
@@ -214,230 +428,149 @@ class MonitoringBot:
         Args:
             metrics: Metrics data to update
         """
-        self.system_status["metrics"] = {
-            **self.system_status.get("metrics", {}),
-            **metrics,
-            "last_update": datetime.now(timezone.utc).isoformat()
-        }
-        
-    async def is_authorized(self, update: Update) -> bool:
-        """
-        Check if a user is authorized to use the bot
+        current = self.system_status.setdefault("metrics", {})
+        current.update(metrics)
+        _set_now_fields(current)
+        
+    async def _log_unauthorized(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Log commands rejected by the authorization filter"""
+        user = update.effective_user
+        chat = update.effective_chat
+        self.logger.warning(
+            f"Unauthorized access attempt - User ID: {user.id if user else None}, "
+            f"Chat ID: {chat.id if chat else None}, "
+            f"Username: {user.username if user else None}"
+        )
         
-        Args:
-            update: Telegram update object
-            
-        Returns:
-            True if user is authorized, False otherwise
-        """
-        if not update.effective_user:
-            return False
+    async def _refresh_services(self):
+        """Query all service callbacks concurrently and store their statuses"""
+        if not self.service_callbacks:
+            return
             
-        user_id = update.effective_user.id
-        chat_id = update.effective_chat.id
-        
-        # If we have no allowed users/chats specified, default to secure (deny all)
-        if not self.allowed_user_ids and not self.allowed_chat_ids:
-            self.logger.warning("No allowed user IDs or chat IDs configured, denying access")
-            return False
+        # A burst of /status and /services only queries the services once
+        if time.monotonic() - self._svc_cache_ts < self._svc_cache_ttl:
+            return
             
-        # Check if user or chat is allowed
-        is_allowed = (
-            user_id in self.allowed_user_ids or
-            chat_id in self.allowed_chat_ids
+        names = list(self.service_callbacks)
+        results = await asyncio.gather(
+            *(self.service_callbacks[name]() for name in names),
+            return_exceptions=True
         )
         
-        if not is_allowed:
-            self.logger.warning(
-                f"Unauthorized access attempt - User ID: {user_id}, Chat ID: {chat_id}, "
-                f"Username: {update.effective_user.username}"
-            )
-            
-        return is_allowed
+        for service_name, result in zip(names, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Error getting status for {service_name}: {result}")
+            else:
+                result = _with_display_time(result)
+                self.system_status["services"][service_name] = result
+                self._track_service_error(service_name, result)
+                
+        self._svc_cache_ts = time.monotonic()
         
     # Command handlers
     
     async def cmd_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler for /start command"""
-        if not await self.is_authorized(update):
-            return
-            
-        await update.message.reply_html(
-            f"👋 <b>Welcome to the Niche Content Syndication Monitor</b>\n\n"
-            f"This bot helps you monitor the status of your content syndication system.\n\n"
-            f"Use /help to see available commands."
-        )
+        await update.message.reply_html(_START_HTML)
         
     async def cmd_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler for /help command"""
-        if not await self.is_authorized(update):
-            return
-            
-        await update.message.reply_html(
-            f"<b>Available Commands</b>\n\n"
-            f"/status - Show current system status\n"
-            f"/services - List all services and their status\n"
-            f"/metrics - Show system performance metrics\n"
-            f"/help - Show this help message"
-        )
+        await update.message.reply_html(_HELP_HTML)
         
     async def cmd_status(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler for /status command"""
-        if not await self.is_authorized(update):
-            return
-            
         # Get fresh service status if available
-        for service_name, callback in self.service_callbacks.items():
-            try:
-                service_status = await callback()
-                self.system_status["services"][service_name] = service_status
-            except Exception as e:
-                self.logger.error(f"Error getting status for {service_name}: {e}")
-                
+        await self._refresh_services()
+        
         # Format status message
         status = self.system_status.get("status", "unknown")
-        last_update = self.system_status.get("last_update", "never")
-        
-        if status == "running":
-            emoji = "✅"
-        elif status == "degraded":
-            emoji = "⚠️"
-        elif status == "error":
-            emoji = "🚨"
-        else:
-            emoji = "❓"
-            
-        # Format timestamp for display
-        if isinstance(last_update, str):
-            try:
-                last_update_dt = datetime.fromisoformat(last_update)
-                last_update = last_update_dt.strftime("%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                pass
-                
-        message = f"{emoji} <b>System Status: {status.upper()}</b>\n\n"
+        last_update = self.system_status.get("last_update_display", "never")
+        
+        emoji = STATUS_EMOJI.get(status, DEFAULT_EMOJI)
+        
+        parts = [f"{emoji} <b>System Status: {status.upper()}</b>\n\n"]
         
         # Add service summary
         services = self.system_status.get("services", {})
         if services:
-            message += "<b>Services:</b>\n"
+            parts.append("<b>Services:</b>\n")
             for service_name, service_data in services.items():
                 service_status = service_data.get("status", "unknown")
-                
-                if service_status == "running":
-                    service_emoji = "✅"
-                elif service_status == "degraded":
-                    service_emoji = "⚠️"
-                elif service_status in ("error", "critical"):
-                    service_emoji = "🚨"
-                else:
-                    service_emoji = "❓"
-                    
-                message += f"{service_emoji} {service_name}: {service_status}\n"
+                service_emoji = STATUS_EMOJI.get(service_status, DEFAULT_EMOJI)
+                parts.append(f"{service_emoji} {service_name}: {service_status}\n")
         else:
-            message += "No services configured.\n"
+            parts.append("No services configured.\n")
             
-        message += f"\n<i>Last updated: {last_update}</i>"
+        parts.append(f"\n<i>Last updated: {last_update}</i>")
         
-        await update.message.reply_html(message)
+        await update.message.reply_html("".join(parts))
         
     async def cmd_services(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler for /services command"""
-        if not await self.is_authorized(update):
-            return
-            
         # Get fresh service status if available
-        for service_name, callback in self.service_callbacks.items():
-            try:
-                service_status = await callback()
-                self.system_status["services"][service_name] = service_status
-            except Exception as e:
-                self.logger.error(f"Error getting status for {service_name}: {e}")
-                
+        await self._refresh_services()
+        
         # Format services message
         services = self.system_status.get("services", {})
         if not services:
             await update.message.reply_html("No services configured.")
             return
             
-        message = "<b>Service Status Details</b>\n\n"
+        parts = ["<b>Service Status Details</b>\n\n"]
         
         for service_name, service_data in services.items():
             service_status = service_data.get("status", "unknown")
-            
-            if service_status == "running":
-                service_emoji = "✅"
-            elif service_status == "degraded":
-                service_emoji = "⚠️"
-            elif service_status in ("error", "critical"):
-                service_emoji = "🚨"
-            else:
-                service_emoji = "❓"
-                
-            message += f"{service_emoji} <b>{service_name}</b>: {service_status}\n"
+            service_emoji = STATUS_EMOJI.get(service_status, DEFAULT_EMOJI)
+            parts.append(f"{service_emoji} <b>{service_name}</b>: {service_status}\n")
             
             # Add details if available
             if "details" in service_data and service_data["details"]:
                 details = service_data["details"]
                 if isinstance(details, dict):
                     for key, value in details.items():
-                        message += f"  - {key}: {value}\n"
+                        parts.append(f"  - {key}: {value}\n")
                 elif isinstance(details, str):
-                    message += f"  - {details}\n"
+                    parts.append(f"  - {details}\n")
                     
-            # Add last update time
-            service_update = service_data.get("last_update")
+            # Add last update time; unparseable callback timestamps are shown as given
+            service_update = service_data.get("last_update_display") or service_data.get("last_update")
             if service_update:
-                try:
-                    if isinstance(service_update, str):
-                        service_update_dt = datetime.fromisoformat(service_update)
-                        service_update = service_update_dt.strftime("%Y-%m-%d %H:%M:%S")
-                    message += f"  <i>Updated: {service_update}</i>\n"
-                except ValueError:
-                    message += f"  <i>Updated: {service_update}</i>\n"
+                parts.append(f"  <i>Updated: {service_update}</i>\n")
                     
-            message += "\n"
+            parts.append("\n")
             
-        await update.message.reply_html(message)
+        await update.message.reply_html("".join(parts))
         
     async def cmd_metrics(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler for /metrics command"""
-        if not await self.is_authorized(update):
-            return
-            
         # Format metrics message
         metrics = self.system_status.get("metrics", {})
         if not metrics:
             await update.message.reply_html("No metrics available.")
             return
             
-        message = "<b>System Metrics</b>\n\n"
+        parts = ["<b>System Metrics</b>\n\n"]
         
         # Remove last_update from display
         metrics_copy = metrics.copy()
         metrics_copy.pop("last_update", None)
+        metrics_copy.pop("last_update_display", None)
         
         # Format metrics data
         for category, values in metrics_copy.items():
-            message += f"<b>{category}</b>\n"
+            parts.append(f"<b>{category}</b>\n")
             
             if isinstance(values, dict):
                 for key, value in values.items():
-                    message += f"  - {key}: {value}\n"
+                    parts.append(f"  - {key}: {value}\n")
             else:
-                message += f"  {values}\n"
+                parts.append(f"  {values}\n")
                 
-            message += "\n"
+            parts.append("\n")
             
         # Add last update time
-        last_update = metrics.get("last_update")
+        last_update = metrics.get("last_update_display")
         if last_update:
-            try:
-                if isinstance(last_update, str):
-                    last_update_dt = datetime.fromisoformat(last_update)
-                    last_update = last_update_dt.strftime("%Y-%m-%d %H:%M:%S")
-                message += f"<i>Last updated: {last_update}</i>"
-            except ValueError:
-                message += f"<i>Last updated: {last_update}</i>"
+            parts.append(f"<i>Last updated: {last_update}</i>")
                 
-        await update.message.reply_html(message)
\ No newline at end of file
+        await update.message.reply_html("".join(parts))
\ No newline at end of file